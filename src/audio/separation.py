@@ -1,11 +1,13 @@
 """Audio source separation for preserving background audio."""
 
-import os
 import logging
+import functools
+import importlib.util
+import warnings
 from pathlib import Path
 from typing import Tuple, Optional
-import tempfile
 import shutil
+import subprocess
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -13,19 +15,73 @@ logger = logging.getLogger(__name__)
 # Check if demucs is available
 try:
     import torch
+    import torch.nn.functional as F
     import torchaudio
     from demucs.pretrained import get_model
-    from demucs.apply import apply_model
+    from demucs.apply import apply_model, BagOfModels
     DEMUCS_AVAILABLE = True
 except ImportError:
     DEMUCS_AVAILABLE = False
     logger.warning("Demucs not available. Install with: pip install demucs")
 
 
-def apply_simple_noise_gate(audio_tensor, sr: int, threshold: float = 0.01) -> torch.Tensor:
+def _gate_and_smooth(audio: "torch.Tensor", threshold: float, window_size: int) -> "torch.Tensor":
+    """
+    Gate [channels, samples] audio and smooth it with a running-mean box filter.
+
+    Args:
+        audio: Audio tensor [channels, samples]
+        threshold: Noise gate threshold (0.0-1.0)
+        window_size: Box filter length in samples (0 disables smoothing)
+
+    Returns:
+        Gated and smoothed audio tensor
+    """
+    # Simple gate: reduce (not zero) audio below threshold
+    gated = audio * torch.where(audio.abs() > threshold, 1.0, 0.1)
+
+    # Apply gentle smoothing to reduce hard cuts
+    if window_size > 0:
+        num_samples = gated.shape[-1]
+        smoothed = F.avg_pool1d(
+            gated.reshape(-1, 1, num_samples),
+            kernel_size=[window_size],
+            stride=[1],
+            padding=[window_size // 2],
+            count_include_pad=False
+        )
+        # Even window sizes yield one extra sample
+        gated = smoothed[..., :num_samples].reshape(audio.shape)
+
+    return gated
+
+
+@functools.lru_cache(maxsize=1)
+def _get_gate_and_smooth():
+    """
+    Script _gate_and_smooth once so the gate and box filter run as one graph.
+
+    TorchScript compiles in milliseconds, unlike torch.compile, which matters
+    for a function that runs once per file. Falls back to eager mode if
+    scripting is unavailable.
+    """
+    try:
+        with warnings.catch_warnings():
+            # Newer torch releases flag torch.jit as deprecated but still support it
+            warnings.simplefilter("ignore", FutureWarning)
+            return torch.jit.script(_gate_and_smooth)
+    except Exception as e:
+        logger.warning(f"TorchScript unavailable for noise gate, running eagerly: {e}")
+        return _gate_and_smooth
+
+
+def apply_simple_noise_gate(audio_tensor, sr: int, threshold: float = 0.01) -> "torch.Tensor":
     """
     Apply a simple noise gate to reduce low-level noise and artifacts.
 
+    Runs as pure torch ops, so the tensor is processed on whatever device it
+    already lives on.
+
     Args:
         audio_tensor: Audio tensor [channels, samples]
         sr: Sample rate
@@ -34,41 +90,100 @@ def apply_simple_noise_gate(audio_tensor, sr: int, threshold: float = 0.01) -> t
     Returns:
         Denoised audio tensor
     """
-    # Import scipy only when needed to avoid dependency issues
+    window_size = int(sr * 0.01)  # 10ms window
+    return _get_gate_and_smooth()(audio_tensor, float(threshold), window_size)
+
+
+def _write_wav(path: Path, audio, sr: int) -> None:
+    """
+    Write a [channels, samples] tensor as 16-bit PCM WAV using soundfile.
+
+    Args:
+        path: Output file path
+        audio: Audio tensor [channels, samples]
+        sr: Sample rate
+    """
+    import soundfile as sf
+
+    # soundfile expects [samples, channels]; make it C-contiguous once here
+    # instead of letting soundfile repack a transposed view
+    audio_np = np.ascontiguousarray(audio.cpu().numpy().T)
+
+    # Float samples outside [-1, 1] would wrap when converted to PCM_16
+    np.clip(audio_np, -1.0, 1.0, out=audio_np)
+
+    sf.write(str(path), audio_np, sr, subtype='PCM_16')
+
+
+def _compile_or_eager(net: "torch.nn.Module", device: str) -> "torch.nn.Module":
+    """
+    Compile a Demucs network, falling back to eager if compilation fails.
+
+    torch.compile only wraps the module; the backend compiles on the first
+    forward pass. A warm-up pass on a silent segment-length input (the shape
+    apply_model feeds it) surfaces compile failures here instead of inside
+    separate().
+
+    Args:
+        net: Demucs network in eval mode on the given device
+        device: Torch device string
+
+    Returns:
+        The compiled network, or net itself if compilation failed
+    """
     try:
-        from scipy import signal
-        use_smoothing = True
-    except ImportError:
-        use_smoothing = False
-
-    # Convert to numpy for processing
-    audio_np = audio_tensor.numpy()
-
-    # Calculate RMS energy for each channel
-    if len(audio_np.shape) == 2:
-        # Stereo: process each channel separately
-        for ch in range(audio_np.shape[0]):
-            channel = audio_np[ch]
-            # Simple gate: reduce (not zero) audio below threshold
-            gate_mask = np.where(np.abs(channel) > threshold, 1.0, 0.1)
-            audio_np[ch] = channel * gate_mask
-    else:
-        # Mono
-        gate_mask = np.where(np.abs(audio_np) > threshold, 1.0, 0.1)
-        audio_np = audio_np * gate_mask
+        compiled = torch.compile(net, mode="reduce-overhead")
+        length = int(net.segment * net.samplerate)
+        dummy = torch.zeros(1, net.audio_channels, length, device=device)
+        # Same grad/autocast state as _separate_chunked, so the graph is reused
+        with torch.no_grad(), torch.autocast(device_type="cuda", dtype=torch.float16):
+            compiled(dummy)
+        return compiled
+    except Exception as e:
+        logger.warning(f"torch.compile failed, using eager model: {e}")
+        return net
+
+
+@functools.lru_cache(maxsize=4)
+def _get_model(model_name: str, device: str):
+    """
+    Load a Demucs model once per (model_name, device) and share it.
 
-    # Apply gentle smoothing to reduce hard cuts
-    if use_smoothing:
-        window_size = int(sr * 0.01)  # 10ms window
-        if window_size > 0:
-            smooth_window = np.ones(window_size) / window_size
-            if len(audio_np.shape) == 2:
-                for ch in range(audio_np.shape[0]):
-                    audio_np[ch] = signal.convolve(audio_np[ch], smooth_window, mode='same')
-            else:
-                audio_np = signal.convolve(audio_np, smooth_window, mode='same')
+    On CUDA (Volta or newer, with Triton installed) the underlying networks
+    are compiled with torch.compile so the compiled graphs are reused across
+    separate() calls. Networks that fail to compile run eagerly.
+
+    Args:
+        model_name: Demucs model name
+        device: Torch device string ("cuda" or "cpu")
+
+    Returns:
+        Demucs model in eval mode on the given device
+    """
+    logger.info(f"Loading Demucs model: {model_name}")
+    model = get_model(model_name)
+    model.to(device)
+    model.eval()
+
+    # NHWC lets cuDNN pick tensor-core kernels for the 2D convs of the
+    # spectrogram branch on Volta and newer; older GPUs keep NCHW
+    if device == "cuda" and torch.cuda.get_device_capability()[0] >= 7:
+        model.to(memory_format=torch.channels_last)
+
+    # Inductor needs Triton and a Volta-or-newer GPU; anything else stays eager
+    if (device == "cuda" and hasattr(torch, "compile")
+            and torch.cuda.get_device_capability()[0] >= 7
+            and importlib.util.find_spec("triton") is not None):
+        # apply_model dispatches on isinstance(model, BagOfModels), so compile
+        # the member networks rather than wrapping the bag itself
+        if isinstance(model, BagOfModels):
+            for i, sub_model in enumerate(model.models):
+                model.models[i] = _compile_or_eager(sub_model, device)
+        else:
+            model = _compile_or_eager(model, device)
 
-    return torch.from_numpy(audio_np)
+    logger.info("Model loaded successfully")
+    return model
 
 
 class AudioSeparator:
@@ -103,17 +218,109 @@ class AudioSeparator:
     def _load_model(self):
         """Lazy load the Demucs model."""
         if self.model is None:
-            logger.info(f"Loading Demucs model: {self.model_name}")
-            self.model = get_model(self.model_name)
-            self.model.to(self.device)
-            logger.info("Model loaded successfully")
+            self.model = _get_model(self.model_name, self.device)
+
+    def _separate_chunked(
+        self,
+        wav: "torch.Tensor",
+        sr: int,
+        shifts: int,
+        overlap: float,
+        chunk_seconds: float
+    ) -> Tuple["torch.Tensor", "torch.Tensor"]:
+        """
+        Run Demucs over fixed-length windows and overlap-add the stems.
+
+        Args:
+            wav: Stereo mix tensor [channels, samples] on the CPU
+            sr: Sample rate
+            shifts: Number of random shifts passed to apply_model
+            overlap: Overlap between consecutive windows (0.25 = 25%)
+            chunk_seconds: Window length in seconds
+
+        Returns:
+            Tuple of (vocals, background) tensors [channels, samples] on the CPU
+        """
+        # Demucs htdemucs outputs 4 stems: drums, bass, other, vocals
+        source_names = self.model.sources
+        vocals_idx = source_names.index("vocals")
+        background_indices = [i for i in range(len(source_names)) if i != vocals_idx]
+
+        channels, length = wav.shape
+        chunk_samples = max(1, min(int(chunk_seconds * sr), length))
+        hop = max(1, int(chunk_samples * (1 - overlap)))
+
+        # Triangular overlap-add weights; never zero, so every sample is covered
+        half = chunk_samples // 2
+        window = torch.cat([
+            torch.arange(1, half + 1),
+            torch.arange(chunk_samples - half, 0, -1)
+        ]).float()
+
+        vocals = torch.zeros(channels, length)
+        background = torch.zeros(channels, length)
+        weight_sum = torch.zeros(length)
+
+        # FP16 autocast on CUDA halves activation bandwidth
+        use_autocast = self.device == "cuda"
+
+        # Reused pinned buffer so each chunk's host-to-device copy is asynchronous.
+        # Overwriting it is safe: copying the previous chunk's stems back to the
+        # CPU synchronizes the stream before the next copy_ below.
+        staging = None
+        if self.device == "cuda":
+            staging = torch.empty((channels, chunk_samples), pin_memory=True)
+
+        for start in range(0, length, hop):
+            chunk = wav[:, start:start + chunk_samples]
+            chunk_len = chunk.shape[-1]
+
+            if staging is not None:
+                chunk = staging[:, :chunk_len].copy_(chunk)
+
+            with torch.no_grad(), torch.autocast(device_type="cuda", dtype=torch.float16, enabled=use_autocast):
+                sources = apply_model(
+                    self.model,
+                    chunk.unsqueeze(0).to(self.device, non_blocking=True),
+                    shifts=shifts,
+                    overlap=overlap,
+                    device=self.device
+                )[0]  # Remove batch dimension
+
+            weight = window[:chunk_len]
+            vocals[:, start:start + chunk_len] += weight * sources[vocals_idx].float().cpu()
+
+            # Instead of simple summation, use weighted average to prevent clipping.
+            # Accumulate in place rather than stacking the stems into a new tensor
+            # (this may reuse the first stem's storage; sources is dropped below).
+            chunk_background = sources[background_indices[0]].float()
+            for i in background_indices[1:]:
+                chunk_background.add_(sources[i])
+            chunk_background.div_(len(background_indices))
+            background[:, start:start + chunk_len] += weight * chunk_background.cpu()
+
+            weight_sum[start:start + chunk_len] += weight
+
+            # Release this chunk's activations before the next one
+            del sources, chunk_background
+            if self.device == "cuda":
+                torch.cuda.empty_cache()
+
+            if start + chunk_len >= length:
+                break
+
+        vocals /= weight_sum
+        background /= weight_sum
+
+        return vocals, background
 
     def separate(
         self,
         audio_path: str,
         output_dir: str,
         shifts: int = 1,
-        overlap: float = 0.25
+        overlap: float = 0.25,
+        chunk_seconds: float = 30.0
     ) -> Tuple[str, str]:
         """
         Separate audio into vocals and background (music/ambient).
@@ -124,6 +331,8 @@ class AudioSeparator:
             shifts: Number of random shifts for separation (higher=better, slower)
                    Default: 1 (fast), recommended: 5-10 (best quality)
             overlap: Overlap between chunks (0.25 = 25%)
+            chunk_seconds: Length of the windows sent to the model at once.
+                   Bounds peak VRAM; lower it if long tracks run out of memory
 
         Returns:
             Tuple of (vocals_path, background_path)
@@ -138,43 +347,37 @@ class AudioSeparator:
         logger.info(f"Using {shifts} shifts with {overlap} overlap")
 
         # Load audio using soundfile (avoids torchcodec dependency)
-        import subprocess
         import soundfile as sf
 
         logger.info("Loading audio with soundfile...")
 
         # Always use soundfile for compatibility
         try:
-            audio_data, sr = sf.read(str(audio_path), always_2d=True)
+            # Decode straight to float32 (no float64 intermediate)
+            audio_data, sr = sf.read(str(audio_path), always_2d=True, dtype='float32')
             # soundfile with always_2d=True returns [samples, channels]
-            # We need [channels, samples] for PyTorch
-            wav = torch.from_numpy(audio_data.T).float()
+            # We need [channels, samples] for PyTorch, laid out contiguously so
+            # chunk slices and device copies are single dense transfers
+            wav = torch.from_numpy(np.ascontiguousarray(audio_data.T))
         except Exception as e:
             logger.warning(f"Soundfile loading failed: {e}")
             logger.info("Converting audio with FFmpeg first...")
 
-            # Fallback: Convert with FFmpeg first
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
-                tmp_path = tmp.name
-
-            try:
-                subprocess.run([
-                    'ffmpeg', '-i', str(audio_path),
-                    '-ar', '44100',  # Standard sample rate
-                    '-ac', '2',      # Stereo
-                    '-y', tmp_path
-                ], check=True, capture_output=True)
-
-                # Load with soundfile
-                audio_data, sr = sf.read(tmp_path, always_2d=True)
-                # Convert to tensor [channels, samples]
-                wav = torch.from_numpy(audio_data.T).float()
-            finally:
-                # Clean up temp file
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-
-        wav = wav.to(self.device)
+            # Fallback: decode with FFmpeg straight into memory as raw
+            # interleaved float32, so no intermediate file is written
+            sr = 44100
+            result = subprocess.run([
+                'ffmpeg', '-i', str(audio_path),
+                '-ar', str(sr),  # Standard sample rate
+                '-ac', '2',      # Stereo
+                '-f', 'f32le',
+                '-acodec', 'pcm_f32le',
+                'pipe:1'
+            ], check=True, capture_output=True)
+
+            # Convert to tensor [channels, samples]
+            audio_data = np.frombuffer(result.stdout, dtype='<f4').reshape(-1, 2)
+            wav = torch.from_numpy(np.ascontiguousarray(audio_data.T))
 
         # Ensure stereo (Demucs expects 2 channels)
         if wav.shape[0] == 1:
@@ -182,37 +385,10 @@ class AudioSeparator:
         elif wav.shape[0] > 2:
             wav = wav[:2]
 
-        # Add batch dimension
-        wav = wav.unsqueeze(0)
-
-        # Apply model
-        logger.info("Running source separation...")
-        with torch.no_grad():
-            sources = apply_model(
-                self.model,
-                wav,
-                shifts=shifts,
-                overlap=overlap,
-                device=self.device
-            )
-
-        # Extract sources
-        # Demucs htdemucs outputs 4 stems: drums, bass, other, vocals
-        sources = sources[0]  # Remove batch dimension
-
-        # Get source indices
-        source_names = self.model.sources
-        vocals_idx = source_names.index("vocals")
-
-        # Extract vocals
-        vocals = sources[vocals_idx].cpu()
-
-        # Combine all non-vocal sources as background with better quality handling
-        background_indices = [i for i in range(len(source_names)) if i != vocals_idx]
-
-        # Instead of simple summation, use weighted average to prevent clipping
-        background_sources = [sources[i] for i in background_indices]
-        background = torch.stack(background_sources, dim=0).mean(dim=0).cpu()
+        # The full track stays on the CPU; only one chunk at a time is moved
+        # to self.device, so peak VRAM scales with chunk length, not track length
+        logger.info(f"Running source separation in {chunk_seconds:.0f}s chunks...")
+        vocals, background = self._separate_chunked(wav, sr, shifts, overlap, chunk_seconds)
 
         # Apply gentle noise reduction to reduce separation artifacts if enabled
         if self.use_enhancement:
@@ -221,20 +397,14 @@ class AudioSeparator:
         else:
             logger.info("  Background enhancement disabled")
 
-        # Save separated audio using soundfile (avoids torchcodec)
-        import soundfile as sf
-
         vocals_path = output_dir / f"{audio_path.stem}_vocals.wav"
         background_path = output_dir / f"{audio_path.stem}_background.wav"
 
         logger.info(f"Saving vocals to: {vocals_path}")
-        # Convert from [channels, samples] to [samples, channels] for soundfile
-        vocals_np = vocals.numpy().T
-        sf.write(str(vocals_path), vocals_np, sr)
+        _write_wav(vocals_path, vocals, sr)
 
         logger.info(f"Saving background to: {background_path}")
-        background_np = background.numpy().T
-        sf.write(str(background_path), background_np, sr)
+        _write_wav(background_path, background, sr)
 
         logger.info("Audio separation complete")
 
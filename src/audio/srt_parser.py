@@ -1,8 +1,103 @@
+import functools
+import mmap
 import re
+import numpy as np
 from typing import List, Dict, Optional
 from pathlib import Path
 
 
+# "HH:MM:SS,mmm" (a period is also accepted as the decimal separator)
+_TIMESTAMP_RE = re.compile(r'(\d+):(\d+):(\d+)(?:[,.](\d+))?')
+
+# One subtitle entry: index line, timing line, then text lines up to the next
+# blank line. The timing line may carry trailing position info, which is ignored.
+# Matched against the raw file bytes, so a UTF-8 BOM may precede the first index.
+_ENTRY_RE = re.compile(
+    rb'^(?:\xef\xbb\xbf)?[ \t]*(\d+)[ \t\r]*\n'
+    rb'[ \t]*(\S+)[ \t]+-->[ \t]+(\S+)[^\n]*'
+    rb'((?:\n(?![ \t\r]*$)[^\n]*)*)',
+    re.MULTILINE
+)
+
+# A carriage return that doesn't start a CRLF, i.e. a classic Mac line ending
+_BARE_CR_RE = re.compile(rb'\r(?!\n)')
+
+
+@functools.lru_cache(maxsize=1)
+def _get_batch_timestamp_parser():
+    """
+    Build the numba-compiled batch timestamp parser.
+
+    numba is imported on first use only, since importing it is slow.
+
+    Returns:
+        Compiled parser, or None if numba is not installed
+    """
+    try:
+        import numba
+    except ImportError:
+        return None
+
+    @numba.njit(cache=True)
+    def parse_batch(stamps):
+        # stamps: uint8 [n, 12] rows of "HH:MM:SS,mmm"; malformed rows give NaN
+        seconds = np.empty(stamps.shape[0], dtype=np.float64)
+        for k in range(stamps.shape[0]):
+            b = stamps[k]
+            valid = b[2] == 58 and b[5] == 58 and (b[8] == 44 or b[8] == 46)
+            digits = np.empty(9, dtype=np.int64)
+            for j, pos in enumerate((0, 1, 3, 4, 6, 7, 9, 10, 11)):
+                digits[j] = b[pos] - 48
+                if digits[j] < 0 or digits[j] > 9:
+                    valid = False
+            if not valid:
+                seconds[k] = np.nan
+                continue
+            hours = digits[0] * 10 + digits[1]
+            minutes = digits[2] * 10 + digits[3]
+            secs = digits[4] * 10 + digits[5]
+            millis = digits[6] * 100 + digits[7] * 10 + digits[8]
+            # Same integer-millisecond arithmetic as srt_timestamp_to_seconds
+            seconds[k] = (((hours * 60 + minutes) * 60 + secs) * 1000 + millis) / 1000
+        return seconds
+
+    return parse_batch
+
+
+def parse_timestamps_batch(timestamps: List[bytes]) -> np.ndarray:
+    """
+    Convert many raw .srt timestamps to seconds at once.
+
+    Fixed-width "HH:MM:SS,mmm" stamps go through the numba parser when numba
+    is installed; anything else uses srt_timestamp_to_seconds.
+
+    Args:
+        timestamps: Raw timestamp bytes (e.g., b"00:00:04,680")
+
+    Returns:
+        Array of times in seconds; NaN where a timestamp is invalid
+    """
+    seconds = np.full(len(timestamps), np.nan)
+    pending = range(len(timestamps))
+
+    parse_batch = _get_batch_timestamp_parser()
+    if parse_batch is not None:
+        fixed = [i for i, stamp in enumerate(timestamps) if len(stamp) == 12]
+        if fixed:
+            stamps = np.frombuffer(b''.join(timestamps[i] for i in fixed), dtype=np.uint8).reshape(-1, 12)
+            seconds[fixed] = parse_batch(stamps)
+        pending = [i for i in pending if np.isnan(seconds[i])]
+
+    for i in pending:
+        try:
+            # latin-1 never fails to decode; junk is rejected by the timestamp parser
+            seconds[i] = srt_timestamp_to_seconds(timestamps[i].decode('latin-1'))
+        except ValueError:
+            pass
+
+    return seconds
+
+
 def srt_timestamp_to_seconds(timestamp: str) -> float:
     """
     Convert .srt timestamp to seconds.
@@ -13,20 +108,16 @@ def srt_timestamp_to_seconds(timestamp: str) -> float:
     Returns:
         Time in seconds as float (e.g., 4.68)
     """
-    # Handle both comma and period as decimal separator
-    timestamp = timestamp.replace(',', '.')
-
-    # Parse HH:MM:SS.mmm
-    parts = timestamp.split(':')
-    if len(parts) != 3:
+    match = _TIMESTAMP_RE.fullmatch(timestamp.strip())
+    if not match:
         raise ValueError(f"Invalid timestamp format: {timestamp}")
 
-    hours = int(parts[0])
-    minutes = int(parts[1])
-    seconds = float(parts[2])
+    hours, minutes, seconds, fraction = match.groups()
 
-    total_seconds = hours * 3600 + minutes * 60 + seconds
-    return total_seconds
+    # Integer milliseconds, so "00:00:04,680" maps exactly onto 4.68
+    millis = int((fraction or '').ljust(3, '0')[:3])
+    total_ms = ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + millis
+    return total_ms / 1000
 
 
 def seconds_to_srt_timestamp(seconds: float) -> str:
@@ -61,12 +152,14 @@ def strip_html_tags(text: str) -> str:
     return clean_text
 
 
-def parse_srt_file(srt_path: str) -> List[Dict]:
+def parse_srt_file(srt_path: str, use_numba: bool = False) -> List[Dict]:
     """
     Parse .srt file and convert to internal segment format.
 
     Args:
         srt_path: Path to .srt subtitle file
+        use_numba: Convert all timestamps in one batch with the numba parser
+            (worthwhile for very large files; ignored if numba is missing)
 
     Returns:
         List of segments in internal format:
@@ -84,52 +177,43 @@ def parse_srt_file(srt_path: str) -> List[Dict]:
     if not srt_file.exists():
         raise FileNotFoundError(f"Subtitle file not found: {srt_path}")
 
-    with open(srt_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Split by double newline (subtitle entries are separated by blank lines)
-    entries = re.split(r'\n\s*\n', content.strip())
+    if srt_file.stat().st_size == 0:
+        raise ValueError(f"No valid subtitles found in {srt_path}")
 
     segments = []
 
-    for entry in entries:
-        if not entry.strip():
-            continue
-
-        lines = entry.strip().split('\n')
-
-        if len(lines) < 3:
-            # Skip malformed entries
-            continue
-
-        # Line 0: Index (e.g., "1")
-        try:
-            index = int(lines[0].strip())
-        except ValueError:
-            # Skip if index is not a number
-            continue
-
-        # Line 1: Timestamp (e.g., "00:00:00,000 --> 00:00:04,680")
-        timestamp_line = lines[1].strip()
-        timestamp_match = re.match(r'(\S+)\s+-->\s+(\S+)', timestamp_line)
-
-        if not timestamp_match:
-            # Skip if timestamp format is invalid
-            continue
-
-        start_time_str = timestamp_match.group(1)
-        end_time_str = timestamp_match.group(2)
-
-        try:
-            start_time = srt_timestamp_to_seconds(start_time_str)
-            end_time = srt_timestamp_to_seconds(end_time_str)
-        except ValueError:
-            # Skip if timestamp conversion fails
-            continue
-
-        # Lines 2+: Subtitle text (can be multi-line)
-        text_lines = lines[2:]
-        text = ' '.join(line.strip() for line in text_lines if line.strip())
+    # Scan the memory-mapped file in place; only matched pieces are copied out
+    with open(srt_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # CR-only files need a normalised copy, since entries are matched
+        # line by line on LF; LF and CRLF files are scanned as they are
+        data = mm
+        if _BARE_CR_RE.search(mm):
+            data = mm[:].replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        matches = [match.group(2, 3, 4) for match in _ENTRY_RE.finditer(data)]
+
+    if use_numba:
+        times = parse_timestamps_batch([stamp for match in matches for stamp in match[:2]]).tolist()
+    else:
+        times = None
+
+    # Entries that don't match (bad index or timing line) are skipped
+    for k, (start_time_raw, end_time_raw, text_block) in enumerate(matches):
+        if times is not None:
+            start_time, end_time = times[2 * k], times[2 * k + 1]
+            if start_time != start_time or end_time != end_time:
+                # Skip if timestamp conversion fails (NaN)
+                continue
+        else:
+            try:
+                # latin-1 never fails to decode; junk is rejected by the timestamp parser
+                start_time = srt_timestamp_to_seconds(start_time_raw.decode('latin-1'))
+                end_time = srt_timestamp_to_seconds(end_time_raw.decode('latin-1'))
+            except ValueError:
+                # Skip if timestamp conversion fails
+                continue
+
+        # Subtitle text (can be multi-line)
+        text = ' '.join(line.strip() for line in text_block.decode('utf-8').split('\n') if line.strip())
 
         # Clean HTML tags
         text = strip_html_tags(text)
@@ -178,37 +262,60 @@ def validate_srt_segments(segments: List[Dict]) -> Dict[str, List[str]]:
     warnings = []
     errors = []
 
-    for i, segment in enumerate(segments):
-        # Check required fields
-        if 'start' not in segment or 'end' not in segment or 'text' not in segment:
+    count = len(segments)
+    has_fields = np.fromiter(
+        ('start' in s and 'end' in s and 'text' in s for s in segments), dtype=bool, count=count
+    )
+
+    # Segments missing fields become NaN, which never trips a comparison below
+    starts = np.fromiter(
+        (s['start'] if ok else np.nan for s, ok in zip(segments, has_fields)), dtype=np.float64, count=count
+    )
+    ends = np.fromiter(
+        (s['end'] if ok else np.nan for s, ok in zip(segments, has_fields)), dtype=np.float64, count=count
+    )
+
+    negative = (starts < 0) | (ends < 0)
+    inverted = starts >= ends
+    empty = np.zeros(count, dtype=bool)
+    empty[[i for i, s in enumerate(segments) if has_fields[i] and not s['text'].strip()]] = True
+
+    # Compare each segment with the previous one
+    overlaps = np.zeros(count, dtype=bool)
+    unordered = np.zeros(count, dtype=bool)
+    overlaps[1:] = starts[1:] < ends[:-1]
+    unordered[1:] = ~overlaps[1:] & (starts[1:] < starts[:-1])
+
+    # Only the flagged segments need a message
+    flagged = np.flatnonzero(~has_fields | negative | inverted | empty | overlaps | unordered)
+
+    for i in flagged.tolist():
+        segment = segments[i]
+
+        if not has_fields[i]:
             errors.append(f"Segment {i}: Missing required fields")
             continue
 
-        # Check negative timestamps
-        if segment['start'] < 0 or segment['end'] < 0:
+        if negative[i]:
             errors.append(f"Segment {i}: Negative timestamp (start={segment['start']}, end={segment['end']})")
 
-        # Check start < end
-        if segment['start'] >= segment['end']:
+        if inverted[i]:
             errors.append(f"Segment {i}: Start time >= end time ({segment['start']} >= {segment['end']})")
 
-        # Check empty text
-        if not segment['text'].strip():
+        if empty[i]:
             warnings.append(f"Segment {i}: Empty text")
 
-        # Check chronological order with previous segment
-        if i > 0:
-            prev_segment = segments[i - 1]
-            if segment['start'] < prev_segment['end']:
-                warnings.append(
-                    f"Segment {i}: Overlaps with previous segment "
-                    f"({segment['start']} < {prev_segment['end']})"
-                )
-            elif segment['start'] < prev_segment['start']:
-                errors.append(
-                    f"Segment {i}: Not in chronological order "
-                    f"({segment['start']} < {prev_segment['start']})"
-                )
+        prev_segment = segments[i - 1] if i > 0 else None
+        if overlaps[i]:
+            warnings.append(
+                f"Segment {i}: Overlaps with previous segment "
+                f"({segment['start']} < {prev_segment['end']})"
+            )
+        elif unordered[i]:
+            errors.append(
+                f"Segment {i}: Not in chronological order "
+                f"({segment['start']} < {prev_segment['start']})"
+            )
 
     return {
         'valid': len(errors) == 0,
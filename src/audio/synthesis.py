@@ -1,10 +1,72 @@
-from elevenlabs import VoiceSettings, Voice, clone, generate, save, set_api_key
+from elevenlabs import VoiceSettings, Voice, clone, set_api_key, get_api_key
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Optional
+import hashlib
 import os
+import shutil
+import subprocess
+import tempfile
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from pydub import AudioSegment
+import numpy as np
+
+from src.audio.utils import concat_audio_files
+
+# Concurrent ElevenLabs requests issued by synthesize_segments
+MAX_SYNTHESIS_WORKERS = 8
+
+# Concurrent ffmpeg processes used to cut voice samples
+MAX_SAMPLE_WORKERS = 4
+
+# File name of the i-th synthesized segment
+SEGMENT_FILENAME = "segment_{:04d}.mp3"
+
+# Retry policy for rate-limited synthesis requests (HTTP 429)
+MAX_RETRIES = 5
+RETRY_BACKOFF_SECONDS = 1.0
+
+ELEVENLABS_API_URL = "https://api.elevenlabs.io/v1"
+
+# Bytes read per write when streaming synthesized audio to disk
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Keep-alive connections held open to ElevenLabs
+HTTP_POOL_SIZE = 32
+
+
+def _create_http_session() -> requests.Session:
+    """
+    Create a pooled HTTP session for ElevenLabs REST calls.
+
+    Connection failures and gateway errors are retried with backoff. Read
+    errors are not, since the request may already have been processed.
+    Rate limiting (429) is handled by the callers.
+
+    Returns:
+        Configured requests session
+    """
+    retry = Retry(
+        total=3,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=None
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry
+    ))
+    return session
+
+
+# Shared across calls so TCP/TLS connections are reused
+_HTTP_SESSION = _create_http_session()
 
 
 def setup_elevenlabs():
@@ -15,6 +77,48 @@ def setup_elevenlabs():
     set_api_key(api_key)
 
 
+def extract_audio_clip(audio_path: str, output_path: str, start: float, end: float) -> str:
+    """
+    Cut a clip out of an audio file with ffmpeg.
+
+    Seeks straight to the clip instead of decoding the whole source file.
+    When source and output share a container the clip is stream-copied;
+    otherwise it is encoded as MP3.
+
+    Args:
+        audio_path: Path to source audio file
+        output_path: Path for output audio file
+        start: Clip start in seconds
+        end: Clip end in seconds
+
+    Returns:
+        Path to extracted clip
+    """
+    if Path(audio_path).suffix.lower() == Path(output_path).suffix.lower():
+        codec_args = ['-c:a', 'copy']
+    else:
+        codec_args = ['-acodec', 'libmp3lame', '-q:a', '4']
+
+    cmd = [
+        'ffmpeg', '-y',
+        '-ss', f"{start:.3f}",
+        '-t', f"{end - start:.3f}",
+        '-i', audio_path,
+        '-vn',
+        *codec_args,
+        output_path
+    ]
+
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg not found. Install with: brew install ffmpeg")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg failed: {e.stderr.decode()}")
+
+    return output_path
+
+
 def prepare_voice_samples(audio_path: str, segments: List[Dict],
                          output_dir: str, max_samples: int = 3) -> List[str]:
     """
@@ -34,25 +138,33 @@ def prepare_voice_samples(audio_path: str, segments: List[Dict],
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    audio = AudioSegment.from_file(audio_path)
-
-    # Sort segments by duration (longest first)
-    sorted_segments = sorted(segments, key=lambda s: s['end'] - s['start'], reverse=True)
-
-    # Take the longest segments (up to max_samples)
-    selected_segments = sorted_segments[:max_samples]
-
-    sample_files = []
-
-    for i, segment in enumerate(selected_segments):
-        start_ms = int(segment['start'] * 1000)
-        end_ms = int(segment['end'] * 1000)
-
-        sample = audio[start_ms:end_ms]
-
-        sample_path = output_path / f"voice_sample_{i:02d}.mp3"
-        sample.export(str(sample_path), format="mp3")
-        sample_files.append(str(sample_path))
+    durations = np.fromiter((s['end'] - s['start'] for s in segments), dtype=np.float64, count=len(segments))
+
+    # Partial selection of the longest segments (up to max_samples), O(n)
+    count = min(max_samples, len(segments))
+    if 0 < count < len(segments):
+        # Everything strictly longer than the count-th longest duration is in;
+        # ties at that duration are filled earliest first, as a stable sort would
+        kth = np.partition(-durations, count - 1)[count - 1]
+        longer = np.flatnonzero(-durations < kth)
+        tied = np.flatnonzero(-durations == kth)[:count - len(longer)]
+        top = np.concatenate([longer, tied])
+    else:
+        top = np.arange(count)
+
+    # Order the few picks longest first (earliest first on ties)
+    top = sorted(top.tolist(), key=lambda i: (-durations[i], i))
+    selected_segments = [segments[i] for i in top]
+
+    sample_paths = [str(output_path / f"voice_sample_{i:02d}.mp3") for i in range(len(selected_segments))]
+
+    # Each sample is an independent ffmpeg process, so cut them in parallel
+    with ThreadPoolExecutor(max_workers=MAX_SAMPLE_WORKERS) as executor:
+        sample_files = list(executor.map(
+            lambda args: extract_audio_clip(audio_path, *args),
+            [(path, segment['start'], segment['end'])
+             for path, segment in zip(sample_paths, selected_segments)]
+        ))
 
     return sample_files
 
@@ -80,13 +192,67 @@ def clone_voice(name: str, audio_files: List[str], description: str = "") -> str
     return voice.voice_id
 
 
+def build_voice(voice_id: str, stability: float = 0.5,
+                similarity_boost: float = 0.8,
+                style: float = 0.4,
+                use_speaker_boost: bool = True) -> Voice:
+    """
+    Build an ElevenLabs voice with the given settings.
+
+    Args:
+        voice_id: ID of voice to use
+        stability: Voice stability (0-1)
+        similarity_boost: How closely to match cloned voice (0-1)
+        style: Style exaggeration (0-1)
+        use_speaker_boost: Boost similarity to original speaker
+
+    Returns:
+        Voice carrying the settings
+    """
+    voice_settings = VoiceSettings(
+        stability=stability,
+        similarity_boost=similarity_boost,
+        style=style,
+        use_speaker_boost=use_speaker_boost
+    )
+
+    return Voice(
+        voice_id=voice_id,
+        settings=voice_settings
+    )
+
+
+def _synthesis_cache_key(voice_id: str, payload: Dict, output_format: str,
+                         optimize_streaming_latency: int) -> str:
+    """
+    Hash everything that determines a synthesized clip into a cache key.
+
+    Args:
+        voice_id: ID of voice used
+        payload: Request body (text, model and voice settings)
+        output_format: Audio output format
+        optimize_streaming_latency: Latency optimization level, which
+            changes the rendered audio
+
+    Returns:
+        Hex digest identifying the clip
+    """
+    key = json.dumps([voice_id, output_format, optimize_streaming_latency, payload],
+                     sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=20).hexdigest()
+
+
 def synthesize_speech(text: str, voice_id: str, output_path: str,
                      model: str = "eleven_multilingual_v2",
                      stability: float = 0.5,
                      similarity_boost: float = 0.8,
                      style: float = 0.4,
                      use_speaker_boost: bool = True,
-                     output_format: str = "mp3_44100_192") -> str:
+                     output_format: str = "mp3_44100_192",
+                     voice: Optional[Voice] = None,
+                     session: Optional[requests.Session] = None,
+                     optimize_streaming_latency: int = 0,
+                     cache_dir: Optional[str] = None) -> str:
     """
     Generate speech from text using cloned voice.
 
@@ -100,35 +266,88 @@ def synthesize_speech(text: str, voice_id: str, output_path: str,
         style: Style exaggeration (0-1). Amplifies original speaker's style
         use_speaker_boost: Boost similarity to original speaker
         output_format: Audio output format (mp3_44100_192 = 192kbps, highest quality)
+        voice: Prebuilt voice; when given, voice_id and the voice settings
+            arguments are ignored
+        session: HTTP session to send the request with (defaults to the
+            module's shared keep-alive session)
+        optimize_streaming_latency: ElevenLabs latency optimization level (0-4).
+            0 keeps full quality; higher levels return the first audio sooner
+            at some cost in pronunciation accuracy
+        cache_dir: Directory of previously synthesized clips. A clip for the
+            same text, voice, model, settings, format and latency level is
+            copied from here instead of calling the API; new clips are
+            added to it
 
     Returns:
         Path to generated audio file
     """
-    setup_elevenlabs()
-
-    voice_settings = VoiceSettings(
-        stability=stability,
-        similarity_boost=similarity_boost,
-        style=style,
-        use_speaker_boost=use_speaker_boost
-    )
+    if voice is None:
+        voice = build_voice(voice_id, stability, similarity_boost, style, use_speaker_boost)
 
-    voice = Voice(
-        voice_id=voice_id,
-        settings=voice_settings
-    )
-
-    audio = generate(
-        text=text,
-        voice=voice,
-        model=model,
-        output_format=output_format
-    )
+    # The streaming endpoint starts sending audio before the whole clip is rendered
+    url = f"{ELEVENLABS_API_URL}/text-to-speech/{voice.voice_id}/stream"
+    payload = {
+        'text': text,
+        'model_id': model,
+        'voice_settings': voice.settings.model_dump() if voice.settings else None
+    }
 
     output_file = Path(output_path)
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
-    save(audio, str(output_path))
+    cache_file = None
+    if cache_dir:
+        cache_key = _synthesis_cache_key(voice.voice_id, payload, output_format, optimize_streaming_latency)
+        cache_file = Path(cache_dir) / f"{cache_key}.{output_format.split('_')[0]}"
+        if cache_file.exists():
+            shutil.copyfile(cache_file, output_file)
+            return str(output_path)
+
+    if not get_api_key():
+        setup_elevenlabs()
+
+    http = session or _HTTP_SESSION
+
+    try:
+        # Back off exponentially when ElevenLabs rejects us for concurrency limits
+        for attempt in range(MAX_RETRIES + 1):
+            response = http.post(
+                url,
+                headers={"xi-api-key": get_api_key()},
+                params={
+                    "output_format": output_format,
+                    "optimize_streaming_latency": optimize_streaming_latency
+                },
+                json=payload,
+                stream=True
+            )
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                break
+            response.close()
+            time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+        try:
+            response.raise_for_status()
+
+            # Write the audio as it arrives instead of buffering the whole clip
+            with open(output_file, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    f.write(chunk)
+        finally:
+            response.close()
+    except requests.exceptions.RequestException as e:
+        # Don't leave a truncated clip behind
+        output_file.unlink(missing_ok=True)
+        raise RuntimeError(f"Speech synthesis API call failed: {e}")
+
+    if cache_file is not None:
+        # Copy under a temporary name and rename, so concurrent readers
+        # never see a partially written cache entry
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_file.parent, suffix='.tmp', delete=False) as tmp:
+            tmp_path = tmp.name
+        shutil.copyfile(output_file, tmp_path)
+        os.replace(tmp_path, cache_file)
 
     return str(output_path)
 
@@ -139,10 +358,16 @@ def synthesize_segments(segments: List[Dict], voice_id: str,
                        similarity_boost: float = 0.8,
                        style: float = 0.4,
                        use_speaker_boost: bool = True,
-                       output_format: str = "mp3_44100_192") -> List[str]:
+                       output_format: str = "mp3_44100_192",
+                       max_workers: int = MAX_SYNTHESIS_WORKERS,
+                       cache_dir: Optional[str] = None) -> List[str]:
     """
     Generate speech for each segment.
 
+    Requests are dispatched concurrently (up to max_workers at a time); the
+    returned paths are in segment order. Each distinct text is synthesized
+    only once.
+
     Args:
         segments: List of segments with translated text
         voice_id: ID of voice to use
@@ -153,6 +378,12 @@ def synthesize_segments(segments: List[Dict], voice_id: str,
         style: Style exaggeration (0-1)
         use_speaker_boost: Boost similarity to original speaker
         output_format: Audio output format (mp3_44100_192 = highest quality)
+        max_workers: Concurrent ElevenLabs requests; keep within the
+            concurrency limit of the account's plan. The shared session
+            keeps at most HTTP_POOL_SIZE connections alive, so more workers
+            than that only churn connections
+        cache_dir: Directory for reusing previously synthesized clips
+            (see synthesize_speech)
 
     Returns:
         List of paths to generated audio files
@@ -160,46 +391,69 @@ def synthesize_segments(segments: List[Dict], voice_id: str,
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    audio_files = []
+    # synthesize_speech sets up the API key on the first uncached clip, so a
+    # fully cached run needs no key at all
+    voice = build_voice(voice_id, stability, similarity_boost, style, use_speaker_boost)
 
+    audio_files = [None] * len(segments)
+    segment_name = SEGMENT_FILENAME.format
+    output_dir_str = str(output_path)
+    segment_paths = [os.path.join(output_dir_str, segment_name(i)) for i in range(len(segments))]
+
+    # Repeated texts (e.g. "Ja.", "Danke.") are synthesized once, at their
+    # first occurrence, and copied to the other segments
+    first_occurrence = {}
     for i, segment in enumerate(segments):
-        file_path = output_path / f"segment_{i:04d}.mp3"
-        synthesize_speech(
-            text=segment['text'],
-            voice_id=voice_id,
-            output_path=str(file_path),
-            model=model,
-            stability=stability,
-            similarity_boost=similarity_boost,
-            style=style,
-            use_speaker_boost=use_speaker_boost,
-            output_format=output_format
-        )
-        audio_files.append(str(file_path))
+        first_occurrence.setdefault(segment['text'], i)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                synthesize_speech,
+                text=segments[i]['text'],
+                voice_id=voice_id,
+                output_path=segment_paths[i],
+                model=model,
+                output_format=output_format,
+                voice=voice,
+                session=_HTTP_SESSION,
+                cache_dir=cache_dir
+            ): i
+            for i in first_occurrence.values()
+        }
+
+        try:
+            for future in as_completed(futures):
+                audio_files[futures[future]] = future.result()
+        except BaseException:
+            # Every queued request is a billed API call; drop the ones that
+            # haven't started instead of waiting on results we'd discard
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    for i, segment in enumerate(segments):
+        source = first_occurrence[segment['text']]
+        if source != i:
+            audio_files[i] = shutil.copyfile(audio_files[source], segment_paths[i])
 
     return audio_files
 
 
-def merge_audio_segments(audio_files: List[str], output_path: str) -> str:
+def merge_audio_segments(audio_files: List[str], output_path: str,
+                         use_ffmpeg: bool = True) -> str:
     """
     Merge multiple audio files into single file.
 
     Args:
         audio_files: List of audio file paths
         output_path: Path for merged output file
+        use_ffmpeg: Concatenate with ffmpeg (see concat_audio_files); False
+            falls back to pydub
 
     Returns:
         Path to merged audio file
     """
-    combined = AudioSegment.empty()
-
-    for audio_file in audio_files:
-        segment = AudioSegment.from_file(audio_file)
-        combined += segment
-
-    combined.export(output_path, format="wav")
-
-    return output_path
+    return concat_audio_files(audio_files, output_path, use_ffmpeg=use_ffmpeg)
 
 
 def get_forced_alignment(audio_path: str, text: str) -> Dict:
@@ -232,7 +486,7 @@ def get_forced_alignment(audio_path: str, text: str) -> Dict:
                 'file': (audio_path, audio_file, 'audio/mpeg')
             }
 
-            response = requests.post(url, headers=headers, files=files)
+            response = _HTTP_SESSION.post(url, headers=headers, files=files)
             response.raise_for_status()
 
             return response.json()
@@ -261,24 +515,21 @@ def align_translated_words(original_alignment: Dict, translated_text: str,
 
     # Simple word count mapping - this is a basic implementation
     # In a more sophisticated version, we could use translation alignment tools
-    original_word_list = [w['text'] for w in original_words]
     translated_word_list = translated_text.split()
 
-    if len(translated_word_list) != len(original_word_list):
+    if len(translated_word_list) != len(original_words):
         # Fallback: use proportional timing if word counts don't match
         return align_by_proportional_timing(original_words, translated_text)
 
-    aligned_words = []
-    for i, (orig_word, trans_word) in enumerate(zip(original_word_list, translated_word_list)):
-        if i < len(original_words):
-            aligned_words.append({
-                'text': trans_word,
-                'start': original_words[i]['start'],
-                'end': original_words[i]['end'],
-                'original_word': orig_word
-            })
-
-    return aligned_words
+    return [
+        {
+            'text': trans_word,
+            'start': orig_word['start'],
+            'end': orig_word['end'],
+            'original_word': orig_word['text']
+        }
+        for orig_word, trans_word in zip(original_words, translated_word_list)
+    ]
 
 
 def align_by_proportional_timing(original_words: List[Dict], translated_text: str) -> List[Dict]:
@@ -294,34 +545,31 @@ def align_by_proportional_timing(original_words: List[Dict], translated_text: st
     """
     translated_words = translated_text.split()
 
-    if not original_words:
+    if not original_words or not translated_words:
         return []
 
     total_duration = original_words[-1]['end'] - original_words[0]['start']
     start_time = original_words[0]['start']
 
-    aligned_words = []
-    total_original_chars = sum(len(w['text']) + 1 for w in original_words)  # +1 for spaces
-    total_translated_chars = len(translated_text)
-
-    current_time = start_time
-    char_position = 0
-
-    for word in translated_words:
-        word_chars = len(word) + 1  # +1 for space
-        proportion = word_chars / total_translated_chars
-        word_duration = proportion * total_duration
-
-        aligned_words.append({
+    # Each word gets a share of the duration proportional to its length
+    word_chars = np.fromiter((len(word) + 1 for word in translated_words),  # +1 for space
+                             dtype=np.float64, count=len(translated_words))
+    ends = start_time + np.cumsum(word_chars / word_chars.sum()) * total_duration
+    # Pin the last word to the original end so rounding can't overshoot it
+    ends[-1] = original_words[-1]['end']
+    starts = np.empty_like(ends)
+    starts[0] = start_time
+    starts[1:] = ends[:-1]
+
+    return [
+        {
             'text': word,
-            'start': current_time,
-            'end': current_time + word_duration,
+            'start': start,
+            'end': end,
             'original_word': ''
-        })
-
-        current_time += word_duration
-
-    return aligned_words
+        }
+        for word, start, end in zip(translated_words, starts.tolist(), ends.tolist())
+    ]
 
 
 def create_word_level_segments(aligned_words: List[Dict]) -> List[Dict]:
@@ -1,32 +1,139 @@
-import whisper
-from typing import Dict, List, Optional
+from faster_whisper import WhisperModel, decode_audio
+import ctranslate2
+import numpy as np
+from typing import Dict, List, Optional, Union
 from pathlib import Path
+import functools
 import json
+import os
+import weakref
 
+# orjson is optional; the stdlib json module is used when it is missing
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-def transcribe_audio(audio_path: str, model_size: str = "base",
+# Whisper models operate on 16 kHz mono audio
+WHISPER_SAMPLE_RATE = 16000
+
+
+def _select_compute_type(device: str) -> str:
+    """
+    Pick the fastest CTranslate2 compute type the device supports.
+
+    int8 weights are preferred (with fp16 activations on CUDA); GPUs without
+    int8 support fall back to plain fp16, and CPUs without it to fp32.
+
+    Args:
+        device: "cuda" or "cpu"
+
+    Returns:
+        CTranslate2 compute type
+    """
+    supported = ctranslate2.get_supported_compute_types(device)
+    preferred = ["int8_float16", "float16"] if device == "cuda" else ["int8", "float32"]
+
+    for compute_type in preferred:
+        if compute_type in supported:
+            return compute_type
+
+    return "default"
+
+
+@functools.lru_cache(maxsize=4)
+def _get_whisper_model(model_size: str) -> WhisperModel:
+    """
+    Load a Whisper model once per size and reuse it across calls.
+
+    Runs on the GPU whenever CUDA is available, with fp16 compute there.
+
+    Args:
+        model_size: Whisper model size (tiny, base, small, medium, large)
+
+    Returns:
+        Loaded Whisper model
+    """
+    device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    return WhisperModel(model_size, device=device, compute_type=_select_compute_type(device))
+
+
+# Decoded tracks keyed by (path, mtime_ns). Entries only live while a caller
+# still holds the array, so a finished transcription does not pin the audio.
+_DECODED_AUDIO: "weakref.WeakValueDictionary[tuple, np.ndarray]" = weakref.WeakValueDictionary()
+
+
+def _decode_audio(audio_path: str, mtime_ns: int) -> np.ndarray:
+    """
+    Decode and resample an audio file for Whisper, reusing a live result.
+
+    Args:
+        audio_path: Path to audio file
+        mtime_ns: Modification time of the file, so edits invalidate the cache
+
+    Returns:
+        Mono float32 samples at WHISPER_SAMPLE_RATE
+    """
+    key = (audio_path, mtime_ns)
+    audio = _DECODED_AUDIO.get(key)
+    if audio is None:
+        audio = decode_audio(audio_path, sampling_rate=WHISPER_SAMPLE_RATE)
+        _DECODED_AUDIO[key] = audio
+    return audio
+
+
+def transcribe_audio(audio_path: Union[str, np.ndarray], model_size: str = "base",
                      language: str = "en") -> Dict:
     """
     Transcribe audio file to text using Whisper.
 
     Args:
-        audio_path: Path to audio file
+        audio_path: Path to audio file, or already decoded mono float32
+            samples at WHISPER_SAMPLE_RATE
         model_size: Whisper model size (tiny, base, small, medium, large)
         language: Source language code
 
     Returns:
         Dictionary containing transcription and segments with timestamps
+        (same layout as openai-whisper's transcribe result)
     """
-    model = whisper.load_model(model_size)
+    model = _get_whisper_model(model_size)
 
-    result = model.transcribe(
-        audio_path,
+    # Reuse the decoded track while another caller still holds it
+    if isinstance(audio_path, np.ndarray):
+        audio = audio_path
+    else:
+        audio = _decode_audio(str(audio_path), os.stat(audio_path).st_mtime_ns)
+
+    segments, info = model.transcribe(
+        audio,
         language=language,
-        task="transcribe",
-        verbose=False
+        task="transcribe"
     )
 
-    return result
+    # Segments are generated lazily; decoding happens while we collect them
+    result_segments = [
+        {
+            'id': segment.id,
+            'seek': segment.seek,
+            'start': segment.start,
+            'end': segment.end,
+            'text': segment.text,
+            'tokens': segment.tokens,
+            'temperature': getattr(segment, 'temperature', None),
+            'avg_logprob': segment.avg_logprob,
+            'compression_ratio': segment.compression_ratio,
+            'no_speech_prob': segment.no_speech_prob
+        }
+        for segment in segments
+    ]
+
+    return {
+        'text': ''.join(segment['text'] for segment in result_segments),
+        'segments': result_segments,
+        'language': info.language
+    }
 
 
 def get_segments(transcription_result: Dict) -> List[Dict]:
@@ -63,6 +170,12 @@ def save_transcription(transcription_result: Dict, output_path: str) -> None:
     output_file = Path(output_path)
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
+    if ORJSON_AVAILABLE:
+        # orjson writes UTF-8 bytes directly (no ASCII escaping)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(transcription_result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(transcription_result, f, ensure_ascii=False, indent=2)
 
@@ -77,6 +190,10 @@ def load_transcription(json_path: str) -> Dict:
     Returns:
         Transcription dictionary
     """
+    if ORJSON_AVAILABLE:
+        with open(json_path, 'rb') as f:
+            return orjson.loads(f.read())
+
     with open(json_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
@@ -111,14 +228,21 @@ def merge_segments(segments: List[Dict], min_words: int = 5) -> List[Dict]:
 
     while i < len(segments):
         current = segments[i].copy()
+        parts = [current['text'].strip()]
+        word_count = len(parts[0].split())
 
-        # Keep merging with next segments until we have > min_words
-        while len(current['text'].split()) <= min_words and i + 1 < len(segments):
+        # Keep merging with next segments until we have > min_words,
+        # tracking the word count instead of re-splitting the merged text
+        while word_count <= min_words and i + 1 < len(segments):
             i += 1
             next_seg = segments[i]
-            current['text'] = current['text'].strip() + " " + next_seg['text'].strip()
+            parts.append(next_seg['text'].strip())
+            word_count += len(parts[-1].split())
             current['end'] = next_seg['end']
 
+        if len(parts) > 1:
+            current['text'] = ' '.join(part for part in parts if part)
+
         merged.append(current)
         i += 1
 
@@ -1,6 +1,16 @@
 from deep_translator import GoogleTranslator, DeeplTranslator
+from deep_translator.exceptions import TooManyRequests, ServerException
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 import os
+import time
+
+# Concurrent translation requests issued by translate_segments
+MAX_TRANSLATION_WORKERS = 10
+
+# Retry policy for rate-limited translation requests (HTTP 429)
+MAX_RETRIES = 5
+RETRY_BACKOFF_SECONDS = 1.0
 
 
 def translate_text(text: str, source_lang: str = "en", target_lang: str = "de",
@@ -29,33 +39,90 @@ def translate_text(text: str, source_lang: str = "en", target_lang: str = "de",
     return translated
 
 
+def _is_rate_limited(error: Exception) -> bool:
+    """
+    Check whether a deep_translator error is an HTTP 429 rejection.
+
+    Google raises TooManyRequests; DeepL raises a ServerException for 429.
+
+    Args:
+        error: Exception raised by a translator
+
+    Returns:
+        True if the request was rejected for rate limiting
+    """
+    if isinstance(error, TooManyRequests):
+        return True
+    return (isinstance(error, ServerException)
+            and error.args[:1] == (ServerException.errors[429],))
+
+
+def _translate_with_retry(text: str, source_lang: str, target_lang: str,
+                          service: str) -> str:
+    """
+    Translate text, backing off exponentially while the service rate-limits us.
+
+    Args:
+        text: Text to translate
+        source_lang: Source language code
+        target_lang: Target language code
+        service: Translation service ('google' or 'deepl')
+
+    Returns:
+        Translated text
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return translate_text(
+                text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                service=service
+            )
+        except (TooManyRequests, ServerException) as e:
+            if not _is_rate_limited(e) or attempt == MAX_RETRIES:
+                raise
+            time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+
 def translate_segments(segments: List[Dict], source_lang: str = "en",
-                      target_lang: str = "de", service: str = "google") -> List[Dict]:
+                      target_lang: str = "de", service: str = "google",
+                      max_workers: int = MAX_TRANSLATION_WORKERS) -> List[Dict]:
     """
     Translate segments while preserving timing information.
 
+    Segments are translated concurrently (up to max_workers requests at a
+    time); the result is in segment order. Each distinct text is translated
+    only once, and rate-limited requests are retried with backoff.
+
     Args:
         segments: List of segments with text and timestamps
         source_lang: Source language code
         target_lang: Target language code
         service: Translation service
+        max_workers: Concurrent translation requests
 
     Returns:
         List of segments with translated text
     """
+    # Repeated texts are only sent once
+    unique_texts = list(dict.fromkeys(segment['text'] for segment in segments))
+
+    # deep_translator has no real batch endpoint (translate_batch loops over
+    # single requests) and its translators keep per-request state, so each
+    # request gets its own translator via translate_text
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        translations = dict(zip(unique_texts, executor.map(
+            lambda text: _translate_with_retry(text, source_lang, target_lang, service),
+            unique_texts
+        )))
+
     translated_segments = []
 
     for segment in segments:
-        translated_text = translate_text(
-            segment['text'],
-            source_lang=source_lang,
-            target_lang=target_lang,
-            service=service
-        )
-
         translated_segment = segment.copy()
         translated_segment['original_text'] = segment['text']
-        translated_segment['text'] = translated_text
+        translated_segment['text'] = translations[segment['text']]
 
         translated_segments.append(translated_segment)
 
@@ -1,11 +1,116 @@
 from pydub import AudioSegment
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict
+import os
 import subprocess
+import tempfile
 import logging
+import ffmpeg
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Concurrent rubberband processes used by merge_time_aligned_segments
+MAX_STRETCH_WORKERS = os.cpu_count() or 1
+
+# File name of the i-th stretched segment
+STRETCHED_FILENAME = "stretched_{:04d}.wav"
+
+
+def _probe_duration(audio_path: str) -> float:
+    """
+    Read the duration of an audio file from its container metadata.
+
+    Args:
+        audio_path: Path to audio file
+
+    Returns:
+        Duration in seconds
+    """
+    probe = ffmpeg.probe(audio_path)
+    return float(probe['format']['duration'])
+
+
+def concat_audio_files(audio_files: List[str], output_path: str,
+                       use_ffmpeg: bool = True) -> str:
+    """
+    Concatenate audio files into a single file.
+
+    With ffmpeg the concat demuxer streams the inputs straight into the
+    output, so nothing is held in memory. Inputs already in the output's
+    container are stream-copied; anything else is decoded once into 16-bit
+    PCM. The pydub path decodes everything in Python and exports WAV; it is
+    kept for setups where the ffmpeg CLI can't be invoked directly.
+
+    Args:
+        audio_files: List of audio file paths, in playback order
+        output_path: Path for concatenated output file
+        use_ffmpeg: Use the ffmpeg concat demuxer instead of pydub
+
+    Returns:
+        Path to concatenated audio file
+    """
+    # ffmpeg rejects an empty concat list; write an empty WAV on both paths
+    if not audio_files:
+        AudioSegment.empty().export(output_path, format="wav")
+        return output_path
+
+    if not use_ffmpeg:
+        segments = [AudioSegment.from_file(audio_file) for audio_file in audio_files]
+
+        # Join raw PCM once instead of `+=`, which copies the whole buffer
+        # on every append. Match every segment to the first one's format.
+        first = segments[0]
+        chunks = [
+            seg.set_frame_rate(first.frame_rate)
+               .set_channels(first.channels)
+               .set_sample_width(first.sample_width)
+               .raw_data
+            for seg in segments
+        ]
+        combined = AudioSegment(
+            data=b''.join(chunks),
+            sample_width=first.sample_width,
+            frame_rate=first.frame_rate,
+            channels=first.channels
+        )
+        combined.export(output_path, format="wav")
+        return output_path
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as list_file:
+        for audio_file in audio_files:
+            # Concat list entries are single-quoted; escape embedded quotes
+            escaped = str(Path(audio_file).resolve()).replace("'", "'\\''")
+            list_file.write(f"file '{escaped}'\n")
+        list_path = list_file.name
+
+    output_suffix = Path(output_path).suffix.lower()
+    if audio_files and all(Path(f).suffix.lower() == output_suffix for f in audio_files):
+        codec_args = ['-c', 'copy']
+    else:
+        codec_args = ['-c:a', 'pcm_s16le']
+
+    cmd = [
+        'ffmpeg', '-y',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', list_path,
+        *codec_args,
+        output_path
+    ]
+
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg not found. Install with: brew install ffmpeg")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg failed: {e.stderr.decode()}")
+    finally:
+        os.unlink(list_path)
+
+    return output_path
+
 
 def time_stretch_segment(audio_path: str, output_path: str, target_duration: float) -> str:
     """
@@ -22,16 +127,24 @@ def time_stretch_segment(audio_path: str, output_path: str, target_duration: flo
     output_file = Path(output_path)
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
-    # Get current duration
-    audio = AudioSegment.from_file(audio_path)
-    current_duration = len(audio) / 1000.0
+    # Get current duration from the container metadata (no decode needed)
+    try:
+        current_duration = _probe_duration(audio_path)
+    except FileNotFoundError:
+        raise RuntimeError("ffprobe not found. Install with: brew install ffmpeg")
+    except ffmpeg.Error as e:
+        raise RuntimeError(f"ffprobe failed: {e.stderr.decode()}")
 
     # Calculate time ratio
     time_ratio = target_duration / current_duration
 
-    # Use rubberband for time-stretching (preserves pitch)
+    # Use rubberband for time-stretching (preserves pitch). Segments are
+    # stretched in parallel, one process per core, so keep each one
+    # single-threaded and quiet
     cmd = [
         'rubberband',
+        '-q',
+        '--no-threads',
         '-t', str(time_ratio),
         audio_path,
         str(output_path)
@@ -47,49 +160,109 @@ def time_stretch_segment(audio_path: str, output_path: str, target_duration: flo
     return str(output_path)
 
 
+def _merge_with_filtergraph(audio_files: List[str], segments: List[Dict],
+                            output_path: str) -> str:
+    """
+    Stretch and concatenate all segments in a single ffmpeg process.
+
+    Each input goes through ffmpeg's rubberband filter and straight into the
+    concat filter, so no intermediate files are written.
+
+    Args:
+        audio_files: List of synthesized audio file paths
+        segments: List of segments with original timing info
+        output_path: Path for merged output file
+
+    Returns:
+        Path to merged audio file
+
+    Raises:
+        ffmpeg.Error: If ffmpeg fails (e.g. built without librubberband)
+        RuntimeError: If ffprobe or ffmpeg is not installed
+    """
+    stretched = []
+    for audio_file, segment in zip(audio_files, segments):
+        try:
+            current_duration = _probe_duration(audio_file)
+        except FileNotFoundError:
+            raise RuntimeError("ffprobe not found. Install with: brew install ffmpeg")
+
+        # The filter takes a speed factor, the inverse of rubberband's -t ratio
+        tempo = current_duration / (segment['end'] - segment['start'])
+        stretched.append(ffmpeg.input(audio_file).audio.filter('rubberband', tempo=tempo))
+
+    stream = ffmpeg.concat(*stretched, v=0, a=1).output(output_path, acodec='pcm_s16le')
+    try:
+        ffmpeg.run(stream, overwrite_output=True, quiet=True)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg not found. Install with: brew install ffmpeg")
+
+    return output_path
+
+
 def merge_time_aligned_segments(audio_files: List[str], segments: List[Dict],
-                                output_path: str) -> str:
+                                output_path: str, use_ffmpeg: bool = True,
+                                max_workers: int = MAX_STRETCH_WORKERS) -> str:
     """
     Merge audio segments with time-stretching to match original timing.
 
+    Stretches and concatenates everything in one ffmpeg filtergraph when
+    ffmpeg has the rubberband filter; otherwise each segment is stretched
+    with the rubberband CLI and the results are joined.
+
     Args:
         audio_files: List of synthesized audio file paths
         segments: List of segments with original timing info
         output_path: Path for merged output file
+        use_ffmpeg: Merge with ffmpeg; False stretches with the rubberband
+            CLI and joins the segments with pydub
+        max_workers: Concurrent rubberband processes when segments are
+            stretched individually
 
     Returns:
         Path to merged audio file
+
+    Raises:
+        ValueError: If the inputs don't pair up or a segment has no duration
     """
     if len(audio_files) != len(segments):
         raise ValueError("Number of audio files must match number of segments")
 
+    for i, segment in enumerate(segments):
+        if segment['end'] <= segment['start']:
+            raise ValueError(
+                f"Segment {i} has no duration to stretch to "
+                f"({segment['start']} -> {segment['end']})"
+            )
+
     output_file = Path(output_path)
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
+    if audio_files and use_ffmpeg:
+        try:
+            return _merge_with_filtergraph(audio_files, segments, output_path)
+        except ffmpeg.Error as e:
+            stderr = e.stderr.decode(errors='replace') if e.stderr else str(e)
+            logger.warning(f"Single-pass ffmpeg merge failed, stretching segments individually: {stderr}")
+
     # Create temp directory for stretched segments
     temp_dir = output_file.parent / "stretched_segments"
     temp_dir.mkdir(exist_ok=True)
 
-    stretched_files = []
-
-    # Time-stretch each segment to match original duration
-    for i, (audio_file, segment) in enumerate(zip(audio_files, segments)):
-        original_duration = segment['end'] - segment['start']
-        stretched_path = temp_dir / f"stretched_{i:04d}.wav"
+    # Time-stretch each segment to match original duration. Every segment is
+    # its own single-threaded rubberband process, so run one per core
+    stretched_name = STRETCHED_FILENAME.format
+    temp_dir_str = str(temp_dir)
+    stretch_jobs = [
+        (audio_file, os.path.join(temp_dir_str, stretched_name(i)), segment['end'] - segment['start'])
+        for i, (audio_file, segment) in enumerate(zip(audio_files, segments))
+    ]
 
-        time_stretch_segment(audio_file, str(stretched_path), original_duration)
-        stretched_files.append(str(stretched_path))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        stretched_files = list(executor.map(lambda job: time_stretch_segment(*job), stretch_jobs))
 
     # Concatenate stretched segments
-    combined = AudioSegment.empty()
-    for stretched_file in stretched_files:
-        segment_audio = AudioSegment.from_file(stretched_file)
-        combined += segment_audio
-
-    # Export merged audio
-    combined.export(output_path, format="wav")
-
-    return output_path
+    return concat_audio_files(stretched_files, output_path, use_ffmpeg=use_ffmpeg)
 
 
 def merge_word_level_segments(audio_files: List[str], segments: List[Dict],
@@ -138,26 +311,27 @@ def create_word_level_audio_mapping(original_segments: List[Dict],
     """
     # For now, create simple word-level segments
     # This would be replaced with actual forced alignment data
-    word_segments = []
-
-    for i, segment in enumerate(translated_segments):
-        words = segment['text'].split()
-        if not words:
-            continue
-
-        segment_duration = segment['end'] - segment['start']
-        word_duration = segment_duration / len(words)
-
-        for j, word in enumerate(words):
-            word_start = segment['start'] + (j * word_duration)
-            word_end = word_start + word_duration
-
-            word_segments.append({
-                'text': word,
-                'start': word_start,
-                'end': word_end,
-                'segment_id': i,
-                'word_id': j
-            })
-
-    return word_segments
+    word_lists = [segment['text'].split() for segment in translated_segments]
+    counts = np.fromiter(map(len, word_lists), dtype=np.int64, count=len(word_lists))
+    if not counts.sum():
+        return []
+
+    seg_starts = np.fromiter((s['start'] for s in translated_segments), dtype=np.float64,
+                             count=len(translated_segments))
+    seg_ends = np.fromiter((s['end'] for s in translated_segments), dtype=np.float64,
+                           count=len(translated_segments))
+    word_durations = (seg_ends - seg_starts) / np.maximum(counts, 1)
+
+    # Segment index and position within the segment for every word
+    seg_idx = np.repeat(np.arange(len(counts)), counts)
+    word_idx = np.arange(len(seg_idx)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    word_starts = seg_starts[seg_idx] + word_idx * word_durations[seg_idx]
+    word_ends = word_starts + word_durations[seg_idx]
+
+    words = [word for word_list in word_lists for word in word_list]
+    return [
+        {'text': word, 'start': start, 'end': end, 'segment_id': i, 'word_id': j}
+        for word, start, end, i, j in zip(words, word_starts.tolist(), word_ends.tolist(),
+                                          seg_idx.tolist(), word_idx.tolist())
+    ]
@@ -8,7 +8,7 @@ from src.audio.transcription import transcribe_audio, get_segments
 from src.audio.transcription import merge_segments as merge_segments_func
 from src.audio.transcription import save_transcription as save_transcription_file
 from src.audio.translation import translate_segments
-from src.audio.synthesis import synthesize_segments, prepare_voice_samples, clone_voice as clone_voice_api, get_forced_alignment, align_translated_words, create_word_level_segments
+from src.audio.synthesis import HTTP_POOL_SIZE, MAX_SYNTHESIS_WORKERS, synthesize_segments, prepare_voice_samples, clone_voice as clone_voice_api, get_forced_alignment, align_translated_words, create_word_level_segments
 from src.audio.utils import merge_time_aligned_segments, merge_word_level_segments
 from src.audio.separation import separate_audio, is_separation_available
 from src.video.merger import merge_audio_video
@@ -42,9 +42,12 @@ load_dotenv()
 @click.option('--word-level-timing', is_flag=True, help='Use ElevenLabs forced alignment for word-level timing (experimental)')
 @click.option('--no-background', is_flag=True, help='Skip voice separation (faster, assumes no background audio)')
 @click.option('--background-enhancement/--no-background-enhancement', default=True, help='Apply noise reduction to separated background audio')
+@click.option('--synthesis-cache', type=click.Path(file_okay=False), default=None, help='Directory for caching synthesized segments across runs')
+@click.option('--synthesis-workers', default=MAX_SYNTHESIS_WORKERS, type=click.IntRange(min=1, max=HTTP_POOL_SIZE), help=f'Concurrent ElevenLabs requests, at most {HTTP_POOL_SIZE} (default: {MAX_SYNTHESIS_WORKERS})')
 def translate_video(input_video, output, source_lang, target_lang, voice_id, clone_voice, voice_name,
                    whisper_model, translation_service, stability, similarity_boost, style, speaker_boost,
-                   temp_dir, keep_temp, save_transcription, srt_input, save_srt, word_level_timing, no_background, background_enhancement):
+                   temp_dir, keep_temp, save_transcription, srt_input, save_srt, word_level_timing, no_background, background_enhancement,
+                   synthesis_cache, synthesis_workers):
     """
     Translate video from one language to another while preserving voice characteristics.
 
@@ -189,7 +192,9 @@ def translate_video(input_video, output, source_lang, target_lang, voice_id, clo
             stability=stability,
             similarity_boost=similarity_boost,
             style=style,
-            use_speaker_boost=speaker_boost
+            use_speaker_boost=speaker_boost,
+            max_workers=synthesis_workers,
+            cache_dir=synthesis_cache
         )
         logger.info(f"  Generated {len(audio_files)} audio segments")
 
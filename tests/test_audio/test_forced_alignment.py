@@ -37,7 +37,7 @@ class TestForcedAlignment:
         }
 
     @patch('src.audio.synthesis.os.getenv')
-    @patch('src.audio.synthesis.requests.post')
+    @patch('src.audio.synthesis._HTTP_SESSION.post')
     @patch('builtins.open', new_callable=mock_open, read_data=b"fake audio data")
     def test_get_forced_alignment_success(self, mock_file, mock_post, mock_getenv, mock_alignment_response):
         """Test successful forced alignment API call."""
@@ -74,7 +74,7 @@ class TestForcedAlignment:
             get_forced_alignment("test_audio.mp3", "Hello world")
 
     @patch('src.audio.synthesis.os.getenv')
-    @patch('src.audio.synthesis.requests.post')
+    @patch('src.audio.synthesis._HTTP_SESSION.post')
     @patch('builtins.open', new_callable=mock_open, read_data=b"fake audio data")
     def test_get_forced_alignment_api_error(self, mock_file, mock_post, mock_getenv):
         """Test forced alignment handles API errors gracefully."""
@@ -145,6 +145,16 @@ class TestWordAlignment:
         assert result[0]['start'] == 0.0
         assert result[2]['end'] <= 2.8  # Allow some tolerance for proportional calculation
 
+    def test_align_by_proportional_timing_spans_original(self):
+        """Test proportional timing covers the original span without gaps."""
+        original_words = [{"text": "one", "start": 0.3, "end": 1.0}, {"text": "two", "start": 1.1, "end": 2.7}]
+
+        result = align_by_proportional_timing(original_words, "eins zwei drei vier fünf sechs sieben")
+
+        assert result[0]['start'] == 0.3
+        assert result[-1]['end'] == 2.7
+        assert all(prev['end'] == cur['start'] for prev, cur in zip(result, result[1:]))
+
     def test_align_by_proportional_timing_empty_words(self):
         """Test proportional timing with empty original words."""
         result = align_by_proportional_timing([], "Hallo Welt")
@@ -6,6 +6,7 @@ from src.audio.srt_parser import (
     seconds_to_srt_timestamp,
     strip_html_tags,
     parse_srt_file,
+    parse_timestamps_batch,
     validate_srt_segments,
     save_segments_as_srt
 )
@@ -44,6 +45,12 @@ class TestSrtTimestamps:
         result = seconds_to_srt_timestamp(seconds)
         assert result == original
 
+    def test_parse_timestamps_batch(self):
+        result = parse_timestamps_batch([b"00:00:04,680", b"02:30:15.500", b"0:0:4,68", b"invalid"])
+
+        assert result[:3].tolist() == [4.68, 9015.5, 4.68]
+        assert result[3] != result[3]  # NaN
+
 
 class TestHtmlStripping:
     def test_strip_html_tags_basic(self):
@@ -162,6 +169,44 @@ Some text
         with pytest.raises(ValueError, match="No valid subtitles found"):
             parse_srt_file(str(malformed_file))
 
+    def test_parse_crlf_srt(self, temp_srt_dir):
+        crlf_content = "1\r\n00:00:00,000 --> 00:00:04,680\r\nFirst line\r\n\r\n2\r\n00:00:04,680 --> 00:00:09,680\r\nSecond line\r\n"
+        crlf_file = temp_srt_dir / "crlf.srt"
+        crlf_file.write_bytes(crlf_content.encode('utf-8'))
+
+        segments = parse_srt_file(str(crlf_file))
+
+        assert [s['text'] for s in segments] == ["First line", "Second line"]
+        assert segments[1]['end'] == 9.68
+
+    def test_parse_cr_only_srt(self, temp_srt_dir):
+        cr_content = "1\r00:00:00,000 --> 00:00:04,680\rFirst line\rcontinued\r\r2\r00:00:04,680 --> 00:00:09,680\rSecond line\r"
+        cr_file = temp_srt_dir / "cr.srt"
+        cr_file.write_bytes(cr_content.encode('utf-8'))
+
+        segments = parse_srt_file(str(cr_file))
+
+        assert [s['text'] for s in segments] == ["First line continued", "Second line"]
+        assert segments[1]['end'] == 9.68
+
+    def test_parse_entry_without_text_is_skipped(self, temp_srt_dir):
+        content = """1
+00:00:00,000 --> 00:00:02,000
+
+2
+00:00:02,000 --> 00:00:04,000
+Only text
+"""
+        srt_file = temp_srt_dir / "no_text.srt"
+        srt_file.write_text(content, encoding='utf-8')
+
+        segments = parse_srt_file(str(srt_file))
+
+        assert len(segments) == 1
+        assert segments[0]['id'] == 0
+        assert segments[0]['start'] == 2.0
+        assert segments[0]['text'] == "Only text"
+
 
 class TestValidation:
     def test_validate_valid_segments(self):
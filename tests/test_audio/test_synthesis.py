@@ -1,8 +1,10 @@
 import pytest
 from pathlib import Path
 import os
+from unittest.mock import patch, MagicMock
+import requests
 from dotenv import load_dotenv
-from src.audio.synthesis import synthesize_speech, synthesize_segments, merge_audio_segments, prepare_voice_samples, clone_voice
+from src.audio.synthesis import extract_audio_clip, synthesize_speech, synthesize_segments, merge_audio_segments, prepare_voice_samples, clone_voice
 
 load_dotenv()
 
@@ -158,4 +160,211 @@ class TestAudioSynthesis:
 
         assert voice_id is not None
         assert isinstance(voice_id, str)
-        assert len(voice_id) > 0
\ No newline at end of file
+        assert len(voice_id) > 0
+
+
+class TestSynthesisConcurrency:
+    """Test concurrent segment synthesis without hitting the API."""
+
+    @pytest.fixture
+    def segments(self):
+        return [{'id': i, 'start': float(i), 'end': float(i + 1), 'text': f'Satz {i}'} for i in range(20)]
+
+    @patch('src.audio.synthesis.synthesize_speech')
+    def test_synthesize_segments_preserves_order(self, mock_speech, segments, tmp_path):
+        mock_speech.side_effect = lambda **kwargs: kwargs['output_path']
+
+        audio_files = synthesize_segments(segments, voice_id="voice", output_dir=str(tmp_path))
+
+        assert audio_files == [str(tmp_path / f"segment_{i:04d}.mp3") for i in range(len(segments))]
+        assert mock_speech.call_count == len(segments)
+
+    @patch('src.audio.synthesis.synthesize_speech')
+    def test_synthesize_segments_synthesizes_repeated_text_once(self, mock_speech, tmp_path):
+        def fake_speech(**kwargs):
+            Path(kwargs['output_path']).write_text(kwargs['text'])
+            return kwargs['output_path']
+
+        mock_speech.side_effect = fake_speech
+        texts = ['Ja.', 'Wie geht es?', 'Ja.', 'Ja.']
+        segments = [{'id': i, 'start': float(i), 'end': float(i + 1), 'text': text} for i, text in enumerate(texts)]
+
+        audio_files = synthesize_segments(segments, voice_id="voice", output_dir=str(tmp_path))
+
+        assert mock_speech.call_count == 2
+        assert audio_files == [str(tmp_path / f"segment_{i:04d}.mp3") for i in range(len(texts))]
+        assert [Path(f).read_text() for f in audio_files] == texts
+
+    @patch('src.audio.synthesis.synthesize_speech')
+    def test_synthesize_segments_shares_voice_and_session(self, mock_speech, segments, tmp_path):
+        mock_speech.side_effect = lambda **kwargs: kwargs['output_path']
+
+        synthesize_segments(segments, voice_id="voice", output_dir=str(tmp_path), stability=0.3)
+
+        voices = {id(call.kwargs['voice']) for call in mock_speech.call_args_list}
+        sessions = {id(call.kwargs['session']) for call in mock_speech.call_args_list}
+        assert len(voices) == 1 and len(sessions) == 1
+        voice = mock_speech.call_args.kwargs['voice']
+        assert voice.voice_id == "voice"
+        assert voice.settings.stability == 0.3
+
+    @patch('src.audio.synthesis.time.sleep')
+    @patch('src.audio.synthesis.get_api_key', return_value="test_api_key")
+    def test_synthesize_speech_retries_rate_limit(self, mock_key, mock_sleep, tmp_path):
+        session = MagicMock()
+        response = MagicMock(status_code=200)
+        response.iter_content.return_value = [b"au", b"dio"]
+        session.post.side_effect = [MagicMock(status_code=429), response]
+
+        output_path = str(tmp_path / "speech.mp3")
+        result = synthesize_speech("Hallo", voice_id="voice", output_path=output_path, session=session)
+
+        assert result == output_path
+        assert session.post.call_count == 2
+        assert session.post.call_args.args[0].endswith("/text-to-speech/voice/stream")
+        assert session.post.call_args.kwargs['stream'] is True
+        assert session.post.call_args.kwargs['headers'] == {"xi-api-key": "test_api_key"}
+        mock_sleep.assert_called_once()
+        assert Path(output_path).read_bytes() == b"audio"
+
+    @patch('src.audio.synthesis.get_api_key', return_value="test_api_key")
+    def test_synthesize_speech_reuses_cached_clip(self, mock_key, tmp_path):
+        response = MagicMock(status_code=200)
+        response.iter_content.return_value = [b"audio"]
+        session = MagicMock()
+        session.post.return_value = response
+        cache_dir = str(tmp_path / "cache")
+
+        synthesize_speech("Hallo", voice_id="voice", output_path=str(tmp_path / "first.mp3"),
+                          session=session, cache_dir=cache_dir)
+        synthesize_speech("Hallo", voice_id="voice", output_path=str(tmp_path / "second.mp3"),
+                          session=session, cache_dir=cache_dir)
+        synthesize_speech("Hallo", voice_id="voice", output_path=str(tmp_path / "third.mp3"),
+                          session=session, cache_dir=cache_dir, stability=0.9)
+
+        assert session.post.call_count == 2
+        assert (tmp_path / "second.mp3").read_bytes() == b"audio"
+        assert len(list(Path(cache_dir).glob("*.mp3"))) == 2
+
+    @patch('src.audio.synthesis.synthesize_speech')
+    def test_synthesize_segments_cancels_pending_requests_on_error(self, mock_speech, segments, tmp_path):
+        def fake_speech(**kwargs):
+            if kwargs['text'] == 'Satz 0':
+                raise RuntimeError("Speech synthesis API call failed")
+            return kwargs['output_path']
+
+        mock_speech.side_effect = fake_speech
+
+        with pytest.raises(RuntimeError, match="Speech synthesis API call failed"):
+            synthesize_segments(segments, voice_id="voice", output_dir=str(tmp_path), max_workers=1)
+
+        # At most the request already picked up by the worker runs after the failure
+        assert mock_speech.call_count <= 2
+
+    @patch('src.audio.synthesis.get_api_key', return_value="test_api_key")
+    def test_synthesize_speech_cache_separates_latency_levels(self, mock_key, tmp_path):
+        response = MagicMock(status_code=200)
+        response.iter_content.return_value = [b"audio"]
+        session = MagicMock()
+        session.post.return_value = response
+        cache_dir = str(tmp_path / "cache")
+
+        synthesize_speech("Hallo", voice_id="voice", output_path=str(tmp_path / "fast.mp3"),
+                          session=session, cache_dir=cache_dir, optimize_streaming_latency=4)
+        synthesize_speech("Hallo", voice_id="voice", output_path=str(tmp_path / "full.mp3"),
+                          session=session, cache_dir=cache_dir, optimize_streaming_latency=0)
+
+        assert session.post.call_count == 2
+        assert session.post.call_args.kwargs['params']['optimize_streaming_latency'] == 0
+
+    def test_synthesize_segments_fully_cached_needs_no_api_key(self, tmp_path):
+        response = MagicMock(status_code=200)
+        response.iter_content.return_value = [b"audio"]
+        session = MagicMock()
+        session.post.return_value = response
+        cache_dir = str(tmp_path / "cache")
+        texts = ['Hallo', 'Tschüss']
+
+        with patch('src.audio.synthesis.get_api_key', return_value="test_api_key"):
+            for text in texts:
+                synthesize_speech(text, voice_id="voice", output_path=str(tmp_path / "warm.mp3"),
+                                  session=session, cache_dir=cache_dir)
+
+        segments = [{'id': i, 'start': float(i), 'end': float(i + 1), 'text': text} for i, text in enumerate(texts)]
+        with patch.dict(os.environ, {}, clear=True), \
+                patch('src.audio.synthesis.get_api_key', return_value=None), \
+                patch('src.audio.synthesis._HTTP_SESSION') as mock_session:
+            audio_files = synthesize_segments(segments, voice_id="voice", output_dir=str(tmp_path / "out"),
+                                              cache_dir=cache_dir)
+
+        mock_session.post.assert_not_called()
+        assert [Path(f).read_bytes() for f in audio_files] == [b"audio", b"audio"]
+
+    @patch('src.audio.synthesis.time.sleep')
+    @patch('src.audio.synthesis.get_api_key', return_value="test_api_key")
+    def test_synthesize_speech_does_not_retry_other_errors(self, mock_key, mock_sleep, tmp_path):
+        response = MagicMock(status_code=404)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Client Error")
+        session = MagicMock()
+        session.post.return_value = response
+
+        with pytest.raises(RuntimeError, match="Speech synthesis API call failed"):
+            synthesize_speech("Hallo", voice_id="voice", output_path=str(tmp_path / "speech.mp3"), session=session)
+
+        assert session.post.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch('src.audio.synthesis.subprocess.run')
+    def test_prepare_voice_samples_cuts_longest_segments(self, mock_run, tmp_path):
+        segments = [
+            {'id': 0, 'start': 0.0, 'end': 3.5, 'text': 'Short'},
+            {'id': 1, 'start': 3.5, 'end': 10.0, 'text': 'Longer segment'},
+            {'id': 2, 'start': 10.0, 'end': 20.0, 'text': 'Longest segment'},
+            {'id': 3, 'start': 20.0, 'end': 22.0, 'text': 'Short again'},
+        ]
+
+        samples = prepare_voice_samples("audio.wav", segments, str(tmp_path), max_samples=2)
+
+        assert samples == [str(tmp_path / "voice_sample_00.mp3"), str(tmp_path / "voice_sample_01.mp3")]
+        assert mock_run.call_count == 2
+
+        commands = {call.args[0][-1]: call.args[0] for call in mock_run.call_args_list}
+        longest = commands[samples[0]]
+        assert longest[longest.index('-ss') + 1] == "10.000"
+        assert longest[longest.index('-t') + 1] == "10.000"
+        assert 'libmp3lame' in longest
+
+    @patch('src.audio.synthesis.subprocess.run')
+    def test_prepare_voice_samples_breaks_ties_by_position(self, mock_run, tmp_path):
+        durations = [3.0, 1.0, 2.0, 1.0, 2.0, 2.0]
+        segments = []
+        start = 0.0
+        for i, duration in enumerate(durations):
+            segments.append({'id': i, 'start': start, 'end': start + duration, 'text': f'Satz {i}'})
+            start += duration
+
+        prepare_voice_samples("audio.wav", segments, str(tmp_path), max_samples=3)
+
+        commands = {call.args[0][-1]: call.args[0] for call in mock_run.call_args_list}
+        starts = [commands[str(tmp_path / f"voice_sample_{i:02d}.mp3")] for i in range(3)]
+        starts = [cmd[cmd.index('-ss') + 1] for cmd in starts]
+        expected = sorted(segments, key=lambda s: s['end'] - s['start'], reverse=True)[:3]
+        assert starts == [f"{s['start']:.3f}" for s in expected]
+
+    @patch('src.audio.synthesis.subprocess.run')
+    def test_extract_audio_clip_stream_copies_same_format(self, mock_run, tmp_path):
+        extract_audio_clip("audio.mp3", str(tmp_path / "clip.mp3"), 1.0, 2.5)
+
+        cmd = mock_run.call_args.args[0]
+        assert cmd[cmd.index('-c:a') + 1] == 'copy'
+        assert 'libmp3lame' not in cmd
+
+    @patch('src.audio.utils.subprocess.run')
+    def test_merge_audio_segments_stream_copies_matching_format(self, mock_run, tmp_path):
+        mp3_files = [str(tmp_path / f"segment_{i:04d}.mp3") for i in range(3)]
+
+        merge_audio_segments(mp3_files, str(tmp_path / "merged.mp3"))
+        assert mock_run.call_args.args[0][-3:-1] == ['-c', 'copy']
+
+        merge_audio_segments(mp3_files, str(tmp_path / "merged.wav"))
+        assert mock_run.call_args.args[0][-3:-1] == ['-c:a', 'pcm_s16le']
@@ -1,5 +1,10 @@
+import os
 import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+import numpy as np
 from pathlib import Path
+from src.audio import transcription
 from src.audio.transcription import transcribe_audio, get_segments, save_transcription, load_transcription, merge_segments
 
 
@@ -45,6 +50,66 @@ class TestAudioTranscription:
         assert len(loaded['segments']) == len(transcription['segments'])
 
 
+class TestTranscriptionCaching:
+    """Test model and audio reuse without running Whisper."""
+
+    @patch('src.audio.transcription.decode_audio')
+    @patch('src.audio.transcription._get_whisper_model')
+    def test_transcribe_audio_decodes_file_once(self, mock_get_model, mock_decode, tmp_path):
+        audio_file = tmp_path / "audio.wav"
+        audio_file.write_bytes(b"")
+        samples = np.zeros(16000, dtype=np.float32)
+        mock_decode.return_value = samples
+
+        segment = SimpleNamespace(id=0, seek=0, start=0.0, end=1.0, text=" Hello", tokens=[1],
+                                  temperature=0.0, avg_logprob=-0.1, compression_ratio=1.0, no_speech_prob=0.0)
+        model = MagicMock()
+        model.transcribe.side_effect = lambda audio, **kwargs: (iter([segment]), SimpleNamespace(language="en"))
+        mock_get_model.return_value = model
+
+        first = transcribe_audio(str(audio_file))
+        second = transcribe_audio(str(audio_file))
+
+        mock_decode.assert_called_once()
+        assert model.transcribe.call_args.args[0] is samples
+        assert first == second
+        assert first['text'] == " Hello"
+        assert get_segments(first) == [{'id': 0, 'start': 0.0, 'end': 1.0, 'text': 'Hello'}]
+
+    @patch('src.audio.transcription.decode_audio')
+    def test_decoded_audio_released_when_unreferenced(self, mock_decode, tmp_path):
+        audio_file = tmp_path / "audio.wav"
+        audio_file.write_bytes(b"")
+        mock_decode.side_effect = lambda *args, **kwargs: np.zeros(16000, dtype=np.float32)
+        key = (str(audio_file), os.stat(audio_file).st_mtime_ns)
+
+        audio = transcription._decode_audio(*key)
+        assert key in transcription._DECODED_AUDIO
+
+        del audio
+        assert key not in transcription._DECODED_AUDIO
+
+
+class TestTranscriptionJson:
+    """Test saving and loading transcriptions without running Whisper."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_save_and_load_round_trip(self, use_orjson, tmp_path):
+        if use_orjson and not transcription.ORJSON_AVAILABLE:
+            pytest.skip("orjson not installed")
+
+        result = {'text': ' Grüß Gott', 'segments': [{'id': 0, 'start': 0.0, 'end': 1.5, 'text': ' Grüß Gott'}],
+                  'language': 'de'}
+        output_json = tmp_path / "transcription.json"
+
+        with patch.object(transcription, 'ORJSON_AVAILABLE', use_orjson):
+            save_transcription(result, str(output_json))
+            loaded = load_transcription(str(output_json))
+
+        assert loaded == result
+        assert 'Grüß' in output_json.read_text(encoding='utf-8')
+
+
 class TestSegmentMerging:
     """Test segment merging functionality."""
 
@@ -1,4 +1,6 @@
 import pytest
+from unittest.mock import patch
+from deep_translator.exceptions import TooManyRequests, ServerException
 from src.audio.translation import translate_text, translate_segments, get_full_translation
 
 
@@ -80,4 +82,54 @@ class TestTranslation:
 
         spanish = translate_text(text, source_lang="en", target_lang="es")
         assert spanish != text
-        assert spanish != german
\ No newline at end of file
+        assert spanish != german
+
+
+class TestTranslationConcurrency:
+    """Test concurrent segment translation without hitting the API."""
+
+    @patch('src.audio.translation.translate_text')
+    def test_translate_segments_preserves_order(self, mock_translate):
+        mock_translate.side_effect = lambda text, **kwargs: text.upper()
+        segments = [{'id': i, 'start': float(i), 'end': float(i + 1), 'text': f'sentence {i}'} for i in range(25)]
+
+        result = translate_segments(segments, max_workers=4)
+
+        assert [seg['text'] for seg in result] == [f'SENTENCE {i}' for i in range(25)]
+        assert [seg['original_text'] for seg in result] == [seg['text'] for seg in segments]
+        assert mock_translate.call_count == len(segments)
+
+    @patch('src.audio.translation.translate_text')
+    def test_translate_segments_translates_repeated_text_once(self, mock_translate):
+        mock_translate.side_effect = lambda text, **kwargs: text.upper()
+        segments = [{'id': i, 'start': float(i), 'end': float(i + 1), 'text': text}
+                    for i, text in enumerate(['yes', 'okay', 'yes', 'thank you', 'okay'])]
+
+        result = translate_segments(segments)
+
+        assert [seg['text'] for seg in result] == ['YES', 'OKAY', 'YES', 'THANK YOU', 'OKAY']
+        assert mock_translate.call_count == 3
+
+    @patch('src.audio.translation.time.sleep')
+    @patch('src.audio.translation.translate_text')
+    def test_translate_segments_retries_rate_limit(self, mock_translate, mock_sleep):
+        mock_translate.side_effect = [TooManyRequests(), ServerException(429), 'HALLO']
+        segments = [{'id': 0, 'start': 0.0, 'end': 1.0, 'text': 'hello'}]
+
+        result = translate_segments(segments)
+
+        assert result[0]['text'] == 'HALLO'
+        assert mock_translate.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    @patch('src.audio.translation.time.sleep')
+    @patch('src.audio.translation.translate_text')
+    def test_translate_segments_does_not_retry_other_errors(self, mock_translate, mock_sleep):
+        mock_translate.side_effect = ServerException(403)
+        segments = [{'id': 0, 'start': 0.0, 'end': 1.0, 'text': 'hello'}]
+
+        with pytest.raises(ServerException):
+            translate_segments(segments)
+
+        assert mock_translate.call_count == 1
+        mock_sleep.assert_not_called()
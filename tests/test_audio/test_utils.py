@@ -1,8 +1,14 @@
 import pytest
+from unittest.mock import patch
+import ffmpeg
 from pathlib import Path
-from src.audio.utils import time_stretch_segment, merge_time_aligned_segments
+from src.audio.utils import (
+    concat_audio_files, time_stretch_segment, merge_time_aligned_segments,
+    create_word_level_audio_mapping
+)
 from src.video.synchronization import get_audio_duration
 from pydub import AudioSegment
+from pydub.generators import Sine
 
 
 class TestAudioUtils:
@@ -110,3 +116,122 @@ class TestAudioUtils:
 
         assert stretched_sample_rate == original_sample_rate
         assert stretched_audio.channels == original_audio.channels
+
+
+class TestTimeAlignedMerging:
+    """Test time-aligned merging without invoking ffmpeg or rubberband."""
+
+    @patch('src.audio.utils._probe_duration', return_value=2.0)
+    @patch('src.audio.utils.ffmpeg.run')
+    def test_merge_time_aligned_segments_single_filtergraph(self, mock_run, mock_probe, tmp_path):
+        segments = [{'id': 0, 'start': 0.0, 'end': 4.0, 'text': 'x'}, {'id': 1, 'start': 4.0, 'end': 5.0, 'text': 'y'}]
+        output_path = str(tmp_path / "merged.wav")
+
+        result = merge_time_aligned_segments(["a.mp3", "b.mp3"], segments, output_path)
+
+        assert result == output_path
+        args = ffmpeg.get_args(mock_run.call_args.args[0])
+        filter_graph = args[args.index('-filter_complex') + 1]
+        assert 'rubberband=tempo=0.5' in filter_graph
+        assert 'rubberband=tempo=2.0' in filter_graph
+        assert 'concat=a=1:n=2:v=0' in filter_graph
+        assert not (tmp_path / "stretched_segments").exists()
+
+    @patch('src.audio.utils.ffmpeg.run')
+    def test_merge_time_aligned_segments_rejects_zero_length_segment(self, mock_run, tmp_path):
+        segments = [{'id': 0, 'start': 0.0, 'end': 1.0, 'text': 'x'}, {'id': 1, 'start': 1.0, 'end': 1.0, 'text': 'y'}]
+
+        with pytest.raises(ValueError, match="Segment 1 has no duration"):
+            merge_time_aligned_segments(["a.mp3", "b.mp3"], segments, str(tmp_path / "merged.wav"))
+
+        mock_run.assert_not_called()
+
+    @patch('src.audio.utils._probe_duration', side_effect=FileNotFoundError("ffprobe"))
+    def test_merge_time_aligned_segments_missing_ffprobe(self, mock_probe, tmp_path):
+        segments = [{'id': 0, 'start': 0.0, 'end': 1.0, 'text': 'x'}]
+
+        with pytest.raises(RuntimeError, match="ffprobe not found"):
+            merge_time_aligned_segments(["a.mp3"], segments, str(tmp_path / "merged.wav"))
+
+    @patch('src.audio.utils._merge_with_filtergraph', side_effect=ffmpeg.Error('ffmpeg', b'', b'No such filter'))
+    @patch('src.audio.utils.concat_audio_files')
+    @patch('src.audio.utils.time_stretch_segment')
+    def test_merge_time_aligned_segments_stretches_in_order(self, mock_stretch, mock_concat, mock_merge, tmp_path):
+        mock_stretch.side_effect = lambda audio_path, output_path, target_duration: output_path
+        segments = [{'id': i, 'start': float(i), 'end': float(i) + 0.5 * (i + 1), 'text': 'x'} for i in range(12)]
+        audio_files = [f"segment_{i:04d}.mp3" for i in range(12)]
+        output_path = str(tmp_path / "merged.wav")
+
+        merge_time_aligned_segments(audio_files, segments, output_path)
+
+        jobs = sorted(call.args for call in mock_stretch.call_args_list)
+        assert jobs == [
+            (audio_files[i], str(tmp_path / "stretched_segments" / f"stretched_{i:04d}.wav"), 0.5 * (i + 1))
+            for i in range(12)
+        ]
+        mock_concat.assert_called_once_with(
+            [str(tmp_path / "stretched_segments" / f"stretched_{i:04d}.wav") for i in range(12)],
+            output_path,
+            use_ffmpeg=True
+        )
+
+    @pytest.mark.parametrize("use_ffmpeg", [True, False])
+    @patch('src.audio.utils.subprocess.run')
+    def test_concat_audio_files_empty_list(self, mock_run, use_ffmpeg, tmp_path):
+        output_path = str(tmp_path / "merged.wav")
+
+        result = concat_audio_files([], output_path, use_ffmpeg=use_ffmpeg)
+
+        assert result == output_path
+        assert len(AudioSegment.from_file(result)) == 0
+        mock_run.assert_not_called()
+
+    @patch('src.audio.utils.subprocess.run')
+    def test_concat_audio_files_pydub_fallback(self, mock_run, tmp_path):
+        first = Sine(440).to_audio_segment(duration=500).set_frame_rate(22050)
+        second = Sine(220).to_audio_segment(duration=300).set_channels(2)
+        first.export(str(tmp_path / "a.wav"), format="wav")
+        second.export(str(tmp_path / "b.wav"), format="wav")
+        output_path = str(tmp_path / "merged.wav")
+
+        result = concat_audio_files(
+            [str(tmp_path / "a.wav"), str(tmp_path / "b.wav")], output_path, use_ffmpeg=False
+        )
+
+        merged = AudioSegment.from_file(result)
+        assert result == output_path
+        assert len(merged) == 800
+        assert merged.frame_rate == 22050
+        assert merged.channels == 1
+        mock_run.assert_not_called()
+
+    @patch('src.audio.utils.subprocess.run')
+    @patch('src.audio.utils._probe_duration', return_value=4.0)
+    def test_time_stretch_segment_uses_probed_duration(self, mock_probe, mock_run, tmp_path):
+        output_path = str(tmp_path / "stretched.wav")
+
+        result = time_stretch_segment("segment.mp3", output_path, 5.0)
+
+        assert result == output_path
+        mock_probe.assert_called_once_with("segment.mp3")
+        assert mock_run.call_args.args[0] == ['rubberband', '-q', '--no-threads', '-t', '1.25', "segment.mp3", output_path]
+
+
+class TestWordLevelMapping:
+    def test_create_word_level_audio_mapping_splits_segments_evenly(self):
+        segments = [
+            {'text': 'one two three', 'start': 0.0, 'end': 1.5},
+            {'text': '   ', 'start': 1.5, 'end': 2.0},
+            {'text': 'four five', 'start': 2.0, 'end': 3.0},
+        ]
+
+        words = create_word_level_audio_mapping([], segments, "orig.wav", "trans.wav")
+
+        assert [w['text'] for w in words] == ['one', 'two', 'three', 'four', 'five']
+        assert [w['segment_id'] for w in words] == [0, 0, 0, 2, 2]
+        assert [w['word_id'] for w in words] == [0, 1, 2, 0, 1]
+        assert [w['start'] for w in words] == pytest.approx([0.0, 0.5, 1.0, 2.0, 2.5])
+        assert [w['end'] for w in words] == pytest.approx([0.5, 1.0, 1.5, 2.5, 3.0])
+
+    def test_create_word_level_audio_mapping_empty(self):
+        assert create_word_level_audio_mapping([], [], "orig.wav", "trans.wav") == []